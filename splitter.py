@@ -1,59 +1,643 @@
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import math
 import os
+import queue
+import shutil
+import struct
 import subprocess
+import tempfile
+import time
 import tkinter as tk
+from pathlib import Path
 from tkinter import filedialog, messagebox
 from tkinter import ttk
 from tkinterdnd2 import DND_FILES, TkinterDnD
 
 AUDIO_EXTENSIONS = ('.mp3', '.wav', '.ogg', '.flac', '.aac', '.m4a', '.wma', '.aiff', '.alac', '.ape', '.opus', '.ra', '.rm', '.wv', '.tta', '.dts', '.ac3', '.amr', '.gsm', '.voc', '.mpc')
+AUDIO_EXT_SET = frozenset(AUDIO_EXTENSIONS)
+AUDIO_FILETYPES = [("Audio Files", " ".join(f"*{ext}" for ext in AUDIO_EXTENSIONS))]
+
+# Encoder and its quality arguments for each output format, VBR where the encoder supports it
+ENCODER_MAP = {
+    'mp3': ('libmp3lame', ['-q:a', '5']),
+    'ogg': ('libvorbis', ['-q:a', '4']),
+    'opus': ('libopus', ['-b:a', '96k', '-vbr', 'on']),
+    'flac': ('flac', ['-compression_level', '5']),
+    'aac': ('aac', ['-b:a', '128k']),
+}
+
+# Sample rates accepted by the encoders that only take a fixed set, highest first
+ENCODER_SAMPLE_RATES = {
+    'libmp3lame': (48000, 44100, 32000, 24000, 22050, 16000, 12000, 11025, 8000),
+    'libopus': (48000, 24000, 16000, 12000, 8000),
+    'aac': (96000, 88200, 64000, 48000, 44100, 32000, 24000, 22050, 16000, 12000, 11025, 8000, 7350),
+}
+
+# FFmpeg reports progress as key=value lines on this pipe
+PROGRESS_ARGS = ['-nostats', '-progress', 'pipe:1']
+
+# Resolved once so every spawn gets an absolute path, which CPython needs to use posix_spawn
+FFMPEG = shutil.which('ffmpeg') or 'ffmpeg'
+FFPROBE = shutil.which('ffprobe') or 'ffprobe'
+
+# On Windows, start FFmpeg and FFprobe without a console window of their own. Elsewhere, keep
+# spawns on CPython's posix_spawn path instead of fork+exec, which would first copy the page
+# tables of the whole Tk process. That path also needs an absolute executable, no
+# start_new_session and no redirection onto fds 0-2. Without close_fds, FFmpeg inherits any
+# fd left open without close-on-exec. Python's own fds are never inheritable, but C libraries
+# in the process (Tcl/Tk, tkdnd, Xlib) don't all guarantee that. FFmpeg never touches such
+# fds, so the worst case is a pipe or socket held open until a chunk finishes.
+if os.name == 'nt':
+    SPAWN_KWARGS = {'creationflags': subprocess.CREATE_NO_WINDOW}
+else:
+    SPAWN_KWARGS = {'close_fds': False}
+
+# EBU R128 targets for loudnorm: integrated loudness, true peak and loudness range
+LOUDNORM_TARGET = 'I=-16:TP=-1.5:LRA=11'
+
+# First-pass loudnorm measurements are kept here so re-splitting a file skips that pass
+LOUDNESS_CACHE_DIR = Path(tempfile.gettempdir()) / 'audiosplitter'
+
+# MPEG audio header tables, indexed by the version bits (0: MPEG 2.5, 2: MPEG 2, 3: MPEG 1)
+MPEG_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+MPEG1_L3_BITRATES = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+MPEG2_L3_BITRATES = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+
+def _wav_probe(f):
+    """Reads duration from a RIFF/WAVE file's fmt and data chunks. Only plain PCM is handled."""
+    f.seek(12)
+    fmt = None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            return None
+        chunk_id, chunk_size = struct.unpack('<4sI', header)
+        if chunk_id == b'fmt ':
+            fmt = f.read(16)
+            if len(fmt) < 16:
+                return None
+            f.seek(chunk_size - 16 + (chunk_size & 1), os.SEEK_CUR)
+        elif chunk_id == b'data':
+            break
+        else:
+            # Chunks are padded to an even size
+            f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+    if fmt is None:
+        return None
+    audio_format, _, sample_rate, byte_rate, _, bits = struct.unpack('<HHIIHH', fmt)
+    if audio_format == 1:
+        codec_name = 'pcm_u8' if bits == 8 else f'pcm_s{bits}le'
+    elif audio_format == 3:
+        codec_name = f'pcm_f{bits}le'
+    else:
+        return None
+    # Streamed and RF64 files don't have a usable size here
+    if not byte_rate or chunk_size == 0xFFFFFFFF:
+        return None
+    # A truncated file claims more data than it has
+    data_size = min(chunk_size, os.fstat(f.fileno()).st_size - f.tell())
+    return {'duration': data_size / byte_rate, 'codec_name': codec_name, 'sample_rate': sample_rate}
+
+def _flac_probe(f):
+    """Reads duration from a FLAC file's STREAMINFO block."""
+    f.seek(4)
+    block = f.read(4 + 34)
+    # STREAMINFO is required to be the first metadata block
+    if len(block) < 38 or block[0] & 0x7F != 0:
+        return None
+    # 20 bits sample rate, 3 bits channels, 5 bits bits-per-sample, 36 bits total samples
+    packed = int.from_bytes(block[4 + 10:4 + 18], 'big')
+    sample_rate = packed >> 44
+    total_samples = packed & ((1 << 36) - 1)
+    if not sample_rate or not total_samples:
+        return None
+    return {'duration': total_samples / sample_rate, 'codec_name': 'flac', 'sample_rate': sample_rate}
+
+def _mp3_frame_info(data, offset):
+    """Parses the MPEG Layer III frame header at offset.
+
+    Returns:
+        tuple: ``(version, sample_rate, frame_length, mono)``, or None if there is no valid header there.
+    """
+    if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+        return None
+    version = (data[offset + 1] >> 3) & 3
+    layer = (data[offset + 1] >> 1) & 3
+    bitrate_index = data[offset + 2] >> 4
+    sample_rate_index = (data[offset + 2] >> 2) & 3
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    sample_rate = MPEG_SAMPLE_RATES[version][sample_rate_index]
+    padding = (data[offset + 2] >> 1) & 1
+    if version == 3:
+        frame_length = 144000 * MPEG1_L3_BITRATES[bitrate_index] // sample_rate + padding
+    else:
+        frame_length = 72000 * MPEG2_L3_BITRATES[bitrate_index] // sample_rate + padding
+    mono = data[offset + 3] >> 6 == 3
+    return version, sample_rate, frame_length, mono
+
+def _mp3_probe(f):
+    """Reads duration from the Xing/Info or VBRI header in an MP3's first frame.
+
+    Files without either header would need every frame scanned for an exact duration, so
+    they are left to FFprobe.
+    """
+    f.seek(0)
+    header = f.read(10)
+    audio_start = 0
+    if header[:3] == b'ID3' and len(header) == 10:
+        # Syncsafe size: 7 bits per byte, plus a 10 byte footer if flagged
+        audio_start = 10 + ((header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9])
+        if header[5] & 0x10:
+            audio_start += 10
+    f.seek(audio_start)
+    data = f.read(1 << 16)
+
+    offset = data.find(b'\xFF')
+    while offset != -1:
+        info = _mp3_frame_info(data, offset)
+        # Require the next frame to line up too, so stray 0xFF bytes aren't taken for a header
+        if info and _mp3_frame_info(data, offset + info[2]):
+            break
+        offset = data.find(b'\xFF', offset + 1)
+    else:
+        return None
+
+    version, sample_rate, _, mono = info
+    samples_per_frame = 1152 if version == 3 else 576
+    # Xing/Info sits right after the side information, whose size depends on version and channels
+    if version == 3:
+        xing_offset = offset + 4 + (17 if mono else 32)
+    else:
+        xing_offset = offset + 4 + (9 if mono else 17)
+
+    frames = None
+    if data[xing_offset:xing_offset + 4] in (b'Xing', b'Info'):
+        flags = struct.unpack('>I', data[xing_offset + 4:xing_offset + 8])[0]
+        if flags & 1:
+            frames = struct.unpack('>I', data[xing_offset + 8:xing_offset + 12])[0]
+    elif data[offset + 36:offset + 40] == b'VBRI':
+        frames = struct.unpack('>I', data[offset + 50:offset + 54])[0]
+    if not frames:
+        return None
+    return {'duration': frames * samples_per_frame / sample_rate, 'codec_name': 'mp3', 'sample_rate': sample_rate}
+
+def _quick_probe(input_file):
+    """Gets what ``probe_audio`` needs straight from the container header, without starting FFprobe.
+
+    Handles WAV, FLAC and MP3 files that carry a Xing/Info or VBRI header.
+
+    Returns:
+        dict: Same as ``probe_audio``, or None if the file isn't one of those.
+    """
+    try:
+        with open(input_file, 'rb') as f:
+            magic = f.read(12)
+            if magic[:4] == b'RIFF' and magic[8:12] == b'WAVE':
+                return _wav_probe(f)
+            if magic[:4] == b'fLaC':
+                return _flac_probe(f)
+            if magic[:3] == b'ID3' or (len(magic) >= 2 and magic[0] == 0xFF and magic[1] & 0xE0 == 0xE0):
+                return _mp3_probe(f)
+    except (OSError, struct.error):
+        pass
+    return None
+
+def probe_audio(input_file):
+    """Gets the duration, codec and sample rate of an audio file.
+
+    Common formats are read straight from their headers, anything else goes through FFprobe.
+
+    Returns:
+        dict: ``duration`` in seconds, plus ``codec_name`` and ``sample_rate`` of the first audio stream (None if there is none).
+    """
+    probe = _quick_probe(input_file)
+    if probe is not None:
+        return probe
+
+    probe_cmd = [FFPROBE, '-i', input_file, '-select_streams', 'a:0', '-show_entries', 'format=duration:stream=codec_name,sample_rate', '-v', 'quiet', '-of', 'json']
+    probe = json.loads(subprocess.check_output(probe_cmd, stdin=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **SPAWN_KWARGS).decode('utf-8'))
+    stream = probe['streams'][0] if probe.get('streams') else {}
+    return {
+        'duration': float(probe['format']['duration']),
+        'codec_name': stream.get('codec_name'),
+        'sample_rate': stream.get('sample_rate'),
+    }
+
+def probe_files(input_files):
+    """Probes several audio files concurrently.
+
+    FFprobe mostly waits on disk, so a handful of threads is enough.
+
+    Returns:
+        dict: Mapping of each input file to its ``probe_audio`` result.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        return dict(zip(input_files, executor.map(probe_audio, input_files)))
+
+def _parse_progress(line):
+    """Returns the seconds of output from a line of FFmpeg's progress pipe, or None for other keys."""
+    key, _, value = line.decode('utf-8').strip().partition('=')
+    # Despite its name, out_time_ms is in microseconds
+    if key == 'out_time_ms' and value.isdigit():
+        return int(value) / 1e6
+    return None
+
+def _measure_task(input_file, probe):
+    """Builds the loudnorm analysis pass for one file, which prints its measurements as JSON on stderr."""
+    ffmpeg_cmd = [FFMPEG, '-hide_banner', *PROGRESS_ARGS, '-i', input_file, '-map', '0:a:0',
+                  '-filter:a', f'loudnorm={LOUDNORM_TARGET}:print_format=json', '-f', 'null', '-']
+    return (ffmpeg_cmd, probe['duration'], [])
+
+def _parse_loudness(stderr):
+    """Extracts the JSON block loudnorm prints at the end of its analysis pass."""
+    output = stderr.decode('utf-8', 'replace')
+    return json.loads(output[output.rindex('{'):output.rindex('}') + 1])
+
+def _usable_loudness(loudness):
+    """Checks that loudnorm measured real numbers.
+
+    Digital silence measures as -inf, which the second loudnorm pass can't be given.
+    """
+    try:
+        return all(math.isfinite(float(loudness[key])) for key in ('input_i', 'input_tp', 'input_lra', 'input_thresh', 'target_offset'))
+    except (KeyError, TypeError, ValueError):
+        return False
 
-def split_audio(input_file, chunk_length_minutes, output_format='mp3', progress_callback=None, cancel_event=None, normalize=False, output_folder=None):
+def _loudness_cache_path(input_file):
+    """Returns where the loudnorm measurements for a file are cached.
+
+    The key hashes the file's first MiB and its size rather than the whole file, which is
+    enough to tell audiobooks apart without reading gigabytes.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(input_file, 'rb') as f:
+        digest.update(f.read(1 << 20))
+    digest.update(str(os.path.getsize(input_file)).encode('utf-8'))
+    digest.update(LOUDNORM_TARGET.encode('utf-8'))
+    return LOUDNESS_CACHE_DIR / f"{digest.hexdigest()}.loudnorm.json"
+
+def _read_cached_loudness(cache_path):
+    """Returns cached loudnorm measurements, or None if there are none usable."""
+    try:
+        loudness = json.loads(cache_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    return loudness if _usable_loudness(loudness) else None
+
+def _write_cached_loudness(cache_path, loudness):
+    """Stores loudnorm measurements for a later run."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(loudness), encoding='utf-8')
+    except OSError as e:
+        # Only a missed speed-up next time, not worth failing the split over
+        print(f"Could not cache loudness measurements: {e}")
+
+def _normalize_args(probe, loudness, encoder):
+    """Returns the FFmpeg arguments that apply the measured loudness correction ahead of encoder."""
+    loudnorm = (f"loudnorm={LOUDNORM_TARGET}:measured_I={loudness['input_i']}:measured_TP={loudness['input_tp']}"
+                f":measured_LRA={loudness['input_lra']}:measured_thresh={loudness['input_thresh']}"
+                f":offset={loudness['target_offset']}:linear=true")
+    args = ['-filter:a', loudnorm]
+    # loudnorm works at 192 kHz internally, so ask for the original rate back, or the
+    # closest one above it the encoder takes (e.g. 48 kHz for Opus from a 44.1 kHz input)
+    if probe.get('sample_rate'):
+        sample_rate = int(probe['sample_rate'])
+        supported = ENCODER_SAMPLE_RATES.get(encoder)
+        if supported and sample_rate not in supported:
+            sample_rate = min((rate for rate in supported if rate > sample_rate), default=supported[0])
+        args.extend(['-ar', str(sample_rate)])
+    return args
+
+def _plan_tasks(input_file, probe, chunk_length_seconds, output_format, loudness, output_folder, jobs, single_pass):
+    """Builds the FFmpeg commands needed to split one file.
+
+    MP3 input split to MP3 without normalization is cut in a single stream-copy pass with the
+    segment muxer. When re-encoding is needed and ``single_pass`` is set, a single segmenting
+    pass decodes and encodes the input once. The segment muxer can only cut on packet
+    boundaries, so both of these land up to a packet late: the input's frames when copying,
+    the encoder's when re-encoding (1152 samples for MP3, 1024 for AAC, 4096 for FLAC).
+    Otherwise each chunk gets its own command, cut at the exact requested sample, so they can
+    be encoded in parallel.
+
+    Args:
+        loudness (dict): loudnorm measurements for the input, or None to skip normalization.
+        single_pass (bool): Whether to re-encode the whole file in one FFmpeg process.
+
+    Returns:
+        list: ``(ffmpeg_cmd, seconds, output_files)`` tuples, where seconds is how much audio the command writes.
+    """
+    if output_format not in ENCODER_MAP:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    encoder, encoder_args = ENCODER_MAP[output_format]
+
+    duration = probe['duration']
+    num_chunks = max(1, math.ceil(duration / chunk_length_seconds))
+    chunk_bounds = [(i * chunk_length_seconds, min((i + 1) * chunk_length_seconds, duration)) for i in range(num_chunks)]
+    # A trailing sliver of a few ms isn't worth its own file, whichever way the file is cut.
+    # The first chunk always stays, however short the input is
+    if len(chunk_bounds) > 1 and chunk_bounds[-1][1] - chunk_bounds[-1][0] < 0.05:
+        chunk_bounds.pop()
+    last_end = chunk_bounds[-1][1]
+    out_dir = Path(output_folder or '.')
+    chunk_name = f"{Path(input_file).stem}.{output_format}"
+    normalize = loudness is not None
+    stream_copy = probe['codec_name'] == 'mp3' and output_format == 'mp3' and not normalize
+    # One thread per ffmpeg when the pool already fills every core, otherwise
+    # let the lone ffmpeg use them all
+    threads = '1' if jobs > 1 else str(os.cpu_count() or 1)
+
+    if stream_copy or single_pass:
+        # The segment muxer expands %03d itself, so escape any literal % in the path
+        output_pattern = str(Path(str(out_dir).replace('%', '%%')) / ("%03d_" + chunk_name.replace('%', '%%')))
+
+        ffmpeg_cmd = [FFMPEG, '-y', *PROGRESS_ARGS, '-threads', threads]
+        if normalize:
+            # Give the filter graph the same share of the cores as the encoder
+            ffmpeg_cmd.extend(['-filter_threads', threads, '-filter_complex_threads', threads])
+        ffmpeg_cmd.extend(['-i', input_file, '-map', '0:a:0'])
+        if stream_copy:
+            ffmpeg_cmd.extend(['-c', 'copy'])
+        else:
+            if normalize:
+                ffmpeg_cmd.extend(_normalize_args(probe, loudness, encoder))
+            ffmpeg_cmd.extend(['-c:a', encoder, *encoder_args, '-threads', threads])
+        if last_end < duration:
+            # Stop where the last planned chunk ends, so no sliver segment gets written
+            ffmpeg_cmd.extend(['-t', str(last_end)])
+        ffmpeg_cmd.extend(['-f', 'segment', '-segment_time', str(chunk_length_seconds), '-segment_start_number', '1', '-reset_timestamps', '1',
+                           output_pattern])
+        return [(ffmpeg_cmd, last_end, [output_pattern % (i + 1) for i in range(len(chunk_bounds))])]
+
+    tasks = []
+    for i, (start_time, end_time) in enumerate(chunk_bounds):
+        output_file = str(out_dir / f"{i+1:03d}_{chunk_name}")
+
+        # -ss before -i seeks in the input instead of decoding everything up to start_time.
+        # -t rather than -to, since input seeking resets timestamps to zero. ffmpeg still
+        # decodes and discards audio between the seek point and start_time (-accurate_seek
+        # is on by default), so re-encoded chunks start on the requested sample
+        ffmpeg_cmd = [FFMPEG, '-y', *PROGRESS_ARGS, '-threads', threads, '-ss', str(start_time), '-i', input_file, '-map', '0:a:0']
+        # Let the last chunk run to the end of the input, in case the duration came up a little short
+        if end_time < duration:
+            ffmpeg_cmd.extend(['-t', str(end_time - start_time)])
+
+        if normalize:
+            ffmpeg_cmd.extend(_normalize_args(probe, loudness, encoder))
+
+        ffmpeg_cmd.extend(['-c:a', encoder, *encoder_args, '-threads', threads, output_file])
+        tasks.append((ffmpeg_cmd, end_time - start_time, [output_file]))
+    return tasks
+
+def _stop_process(proc, force=False):
+    """Asks an FFmpeg to quit, or kills it if force is set. It starts no children of its own, so signalling it alone is enough."""
+    try:
+        if force:
+            proc.kill()
+        else:
+            proc.terminate()
+    except ProcessLookupError:
+        pass
+
+async def _run_task(semaphore, stop, cancel_event, key, ffmpeg_cmd, seconds, live_procs, task_progress, started):
+    """Runs a single FFmpeg command once a pool slot is free, recording how many seconds of it are done in task_progress.
+
+    Records in started when the process was spawned, so cleanup knows which outputs it may have touched.
+
+    Returns:
+        bytes: What FFmpeg wrote to stderr, or None if the task was stopped.
+    """
+    async with semaphore:
+        # Check the cancel itself too, the runner only notices it between its waits
+        if cancel_event and cancel_event.is_set():
+            stop.set()
+        if stop.is_set():
+            return None
+
+        started[key] = time.time()
+        # stdin is detached too, otherwise every FFmpeg in the pool reads the terminal for its key commands
+        proc = await asyncio.create_subprocess_exec(*ffmpeg_cmd, stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, **SPAWN_KWARGS)
+        live_procs[key] = proc
+        try:
+            # The runner may have swept live_procs while the process was starting
+            if stop.is_set():
+                _stop_process(proc)
+            # Drain stderr alongside the progress pipe so neither can fill up and block FFmpeg
+            stderr_read = asyncio.ensure_future(proc.stderr.read())
+            async for line in proc.stdout:
+                done_seconds = _parse_progress(line)
+                if done_seconds is not None:
+                    task_progress[key] = min(done_seconds, seconds)
+            stderr = await stderr_read
+            returncode = await proc.wait()
+        finally:
+            del live_procs[key]
+
+    if stop.is_set():
+        return None
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, ffmpeg_cmd, stderr=stderr)
+    task_progress[key] = seconds
+    return stderr
+
+async def _run_tasks_async(tasks, jobs, progress_callback, cancel_event):
+    """Drives every task from one event loop, stopping them all on cancel or the first failure.
+
+    Output a stopped or failed task wrote during this run is deleted, so a half-written chunk
+    can't be mistaken for a finished one. Files from earlier runs that the task never got to
+    are left alone.
+    """
+    if cancel_event and cancel_event.is_set():
+        return None
+
+    total_seconds = sum(seconds for _, seconds, _ in tasks) or 1
+    semaphore = asyncio.Semaphore(jobs)
+    stop = asyncio.Event()
+    live_procs = {}
+    task_progress = {}
+    started = {}
+    runs = [asyncio.ensure_future(_run_task(semaphore, stop, cancel_event, key, ffmpeg_cmd, seconds, live_procs, task_progress, started))
+            for key, (ffmpeg_cmd, seconds, _) in enumerate(tasks)]
+    pending = runs
+    last_progress = None
+    while pending:
+        # Wake up periodically so a cancel doesn't wait for a whole chunk
+        done, pending = await asyncio.wait(pending, timeout=0.1, return_when=asyncio.FIRST_COMPLETED)
+
+        failed = [task for task in done if task.exception()]
+        if failed or (cancel_event and cancel_event.is_set()):
+            stop.set()
+            for proc in list(live_procs.values()):
+                _stop_process(proc)
+            if pending:
+                # Give FFmpeg a moment to exit cleanly, then force it
+                _, stuck = await asyncio.wait(pending, timeout=2)
+                if stuck:
+                    for proc in list(live_procs.values()):
+                        _stop_process(proc, force=True)
+                # Let the stopped processes be reaped before the loop closes
+                await asyncio.gather(*pending, return_exceptions=True)
+
+            for key, (run, (_, _, output_files)) in enumerate(zip(runs, tasks)):
+                if key not in started or not (run.exception() or run.result() is None):
+                    continue
+                # A segmenting task only reaches some of its files, so go by modification time.
+                # The slack covers filesystems that store mtimes in 2 second steps
+                for output_file in output_files:
+                    try:
+                        if os.path.getmtime(output_file) >= started[key] - 2:
+                            os.remove(output_file)
+                    except FileNotFoundError:
+                        pass
+            if failed:
+                failed[0].result()
+            return None
+
+        # Tasks only record seconds encoded, progress is reported from here
+        progress = min(sum(task_progress.values()) / total_seconds * 100, 100)
+        if progress_callback and progress != last_progress:
+            progress_callback(progress)
+            last_progress = progress
+
+    return [run.result() for run in runs]
+
+def _run_tasks(tasks, jobs, progress_callback, cancel_event):
+    """Runs FFmpeg commands from _plan_tasks, up to ``jobs`` at a time.
+
+    A single asyncio event loop reads every process's pipes and paces the pool. Reaping differs
+    by version: Python 3.12+ on Linux waits on a pidfd inside the loop, but earlier versions
+    on POSIX start one waitpid thread per running process, at most ``jobs`` of them at once.
+    Blocks until done, so call it from a worker thread when a UI needs to stay responsive.
+
+    Returns:
+        list: Each task's stderr output in order, or None if cancelled.
+    """
+    return asyncio.run(_run_tasks_async(tasks, jobs, progress_callback, cancel_event))
+
+def _check_output_names(input_files, probes, chunk_length_seconds, output_format, output_folder):
+    """Raises ValueError if two inputs would write the same chunk file.
+
+    Chunks are named after the input's stem, so e.g. ``talk.mp3`` and ``talk.wav`` would both
+    write ``001_talk.mp3``, at the same time once they share the pool.
+    """
+    planned_by = {}
+    for input_file in input_files:
+        # Only the names are needed, and those don't depend on how the file gets encoded
+        for _, _, output_files in _plan_tasks(input_file, probes[input_file], chunk_length_seconds, output_format, None, output_folder, 1, False):
+            for output_file in output_files:
+                other_file = planned_by.setdefault(os.path.normcase(os.path.abspath(output_file)), input_file)
+                if other_file != input_file:
+                    raise ValueError(f"{other_file} and {input_file} would both be split into {output_file}. "
+                                     "Rename one of them or split them separately.")
+
+def _split_files(input_files, probes, chunk_length_minutes, output_format, progress_callback, cancel_event, normalize, output_folder, jobs):
+    """Runs the split for already-probed files, measuring loudness first if normalizing."""
+    chunk_length_seconds = chunk_length_minutes * 60
+    jobs = jobs or os.cpu_count() or 1
+    _check_output_names(input_files, probes, chunk_length_seconds, output_format, output_folder)
+    loudness = dict.fromkeys(input_files)
+    cache_paths = {}
+    to_measure = []
+
+    if normalize:
+        cache_paths = {input_file: _loudness_cache_path(input_file) for input_file in input_files}
+        loudness = {input_file: _read_cached_loudness(cache_paths[input_file]) for input_file in input_files}
+        to_measure = [input_file for input_file in input_files if loudness[input_file] is None]
+
+        if to_measure:
+            # First pass measures each file's loudness, second applies it; each gets half the bar
+            def measure_progress(progress):
+                if progress_callback:
+                    progress_callback(progress / 2)
+
+            measurements = _run_tasks([_measure_task(input_file, probes[input_file]) for input_file in to_measure], jobs, measure_progress, cancel_event)
+            if measurements is None:
+                return
+            for input_file, stderr in zip(to_measure, measurements):
+                loudness[input_file] = _parse_loudness(stderr)
+                if not _usable_loudness(loudness[input_file]):
+                    print(f"Not normalizing {input_file}, its loudness could not be measured (silent audio?)")
+                    loudness[input_file] = None
+                    continue
+                _write_cached_loudness(cache_paths[input_file], loudness[input_file])
+
+    encode_start = 50 if to_measure else 0
+
+    def encode_progress(progress):
+        if progress_callback:
+            progress_callback(encode_start + progress * (100 - encode_start) / 100)
+
+    # With at least one file per pool slot, one process per file already keeps every core busy
+    # and pays FFmpeg's startup and codec setup once per file rather than once per chunk
+    single_pass = len(input_files) >= jobs
+
+    tasks = []
+    for input_file in input_files:
+        tasks.extend(_plan_tasks(input_file, probes[input_file], chunk_length_seconds, output_format, loudness[input_file], output_folder, jobs, single_pass))
+    _run_tasks(tasks, jobs, encode_progress, cancel_event)
+
+def split_audio(input_file, chunk_length_minutes, output_format='mp3', progress_callback=None, cancel_event=None, normalize=False, output_folder=None, jobs=None, probe=None):
     """Splits an audio file into equal-length chunks.
 
+    MP3 input split to MP3 without normalization is cut in a single stream-copy pass.
+    Anything that needs re-encoding runs one FFmpeg per chunk, up to ``jobs`` of them in parallel,
+    or a single FFmpeg that decodes the input once when ``jobs`` is 1.
+
     Args:
         input_file (str): Path to the input audio file.
         chunk_length_minutes (int): Desired length of each chunk in minutes.
-        output_format (str, optional): Output format (default: 'mp3').
+        output_format (str, optional): Output format, one of ``ENCODER_MAP`` (default: 'mp3').
         progress_callback (function, optional): Callback function to update progress.
         cancel_event (threading.Event, optional): Event to signal cancellation.
-        normalize (bool, optional): Whether to normalize audio volume (default: False).
+        normalize (bool, optional): Whether to normalize audio loudness with two-pass EBU R128 ``loudnorm`` (default: False).
         output_folder (str, optional): Path to the output folder (default: None, uses current directory).
+        jobs (int, optional): Number of chunks to encode concurrently (default: None, uses the CPU count).
+        probe (dict, optional): Result of ``probe_audio`` for input_file, if already known (default: None, probes it).
     """
 
     try:        
-        chunk_length_seconds = chunk_length_minutes * 60
+        if probe is None:
+            probe = probe_audio(input_file)
 
-        # Get audio duration using FFprobe
-        duration_cmd = ['ffprobe', '-i', input_file, '-show_entries', 'format=duration', '-v', 'quiet', '-of', 'csv=p=0']
-        duration = float(subprocess.check_output(duration_cmd).decode('utf-8').strip())
-        
-        num_chunks = int(duration / chunk_length_seconds) + 1
-        
-        original_filename = os.path.splitext(os.path.basename(input_file))[0]
+        _split_files([input_file], {input_file: probe}, chunk_length_minutes, output_format, progress_callback, cancel_event, normalize, output_folder, jobs)
+        return True
 
-        # Split audio using FFmpeg
-        for i in range(num_chunks):
-            if cancel_event and cancel_event.is_set():
-                return True
+    except subprocess.CalledProcessError as e:
+        print(f"Error during FFmpeg execution: {e}")
+        raise
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        raise
 
-            start_time = i * chunk_length_seconds
-            end_time = min((i + 1) * chunk_length_seconds, duration)
-            output_file = f"{i+1:03d}_{original_filename}.{output_format}"
-            if output_folder:
-                output_file = os.path.join(output_folder, output_file)
+def split_many(input_files, chunk_length_minutes, output_format='mp3', progress_callback=None, cancel_event=None, normalize=False, output_folder=None, jobs=None):
+    """Splits several audio files into equal-length chunks.
 
-            ffmpeg_cmd = ['ffmpeg', '-y', '-i', input_file, '-ss', str(start_time), '-to', str(end_time)]
-            
-            if normalize:
-                ffmpeg_cmd.extend(['-filter:a', 'speechnorm=e=12.5:r=0.0001:l=1'])
-            
-            ffmpeg_cmd.extend(['-c:a', 'libmp3lame', output_file])
-            
-            subprocess.run(ffmpeg_cmd, check=True)
+    All files are probed up front and their chunks share one pool, so short files don't
+    leave cores idle while waiting for the next file to start. With at least ``jobs`` files,
+    each file is split by a single FFmpeg instead of one per chunk. Files whose chunks would
+    get the same names (same stem, one output folder) are refused before anything runs.
+
+    Args:
+        input_files (list): Paths to the input audio files.
+        chunk_length_minutes (int): Desired length of each chunk in minutes.
+        output_format (str, optional): Output format, one of ``ENCODER_MAP`` (default: 'mp3').
+        progress_callback (function, optional): Callback function to update overall progress.
+        cancel_event (threading.Event, optional): Event to signal cancellation.
+        normalize (bool, optional): Whether to normalize audio loudness with two-pass EBU R128 ``loudnorm`` (default: False).
+        output_folder (str, optional): Path to the output folder (default: None, uses current directory).
+        jobs (int, optional): Number of chunks to encode concurrently (default: None, uses the CPU count).
+    """
+
+    try:
+        probes = probe_files(input_files)
 
-            if progress_callback:
-                progress = (i + 1) / num_chunks * 100
-                progress_callback(progress)
+        _split_files(input_files, probes, chunk_length_minutes, output_format, progress_callback, cancel_event, normalize, output_folder, jobs)
+        return True
 
     except subprocess.CalledProcessError as e:
         print(f"Error during FFmpeg execution: {e}")
@@ -79,7 +663,7 @@ class GUI:
         self.frame = ttk.Frame(self.master, padding="20 20 20 20", style="TFrame")
         self.frame.pack(fill=tk.BOTH, expand=True)
 
-        self.label = ttk.Label(self.frame, text="Drag and drop audio file here\nor click 'Choose File'", anchor="center", justify="center")
+        self.label = ttk.Label(self.frame, text="Drag and drop audio files here\nor click 'Choose File'", anchor="center", justify="center")
         self.label.pack(pady=(20, 10))
 
         self.progress_bar = ttk.Progressbar(self.frame, orient="horizontal", length=400, mode="determinate", style="TProgressbar")
@@ -132,27 +716,36 @@ class GUI:
         self.master.drop_target_register(DND_FILES)
         self.master.dnd_bind('<<Drop>>', self.drop)
 
-        self.file_path = None
+        self.file_paths = []
         self.cancel_event = None
 
+        # Worker threads must not touch Tk, so they queue UI changes for the Tk thread to apply:
+        # ('progress', value), ('label', text, color), ('messagebox', title, message) or ('reset',)
+        self.ui_queue = queue.Queue()
+        self.master.after(50, self.drain_ui_queue)
+
     def validate_number(self, value):
         return value.isdigit() or value == ""
 
     def drop(self, event):
-        self.file_path = event.data
-        if self.file_path.startswith('{'):
-            self.file_path = self.file_path[1:-1]        
-        
-        if not self.file_path.lower().endswith(AUDIO_EXTENSIONS):
-            messagebox.showerror("Error", "The dropped file is not a supported audio file.")
-            self.file_path = None
+        # Tcl list syntax: paths are space separated, with {} around any containing spaces
+        dropped = self.master.tk.splitlist(event.data)
+        file_paths = [path for path in dropped if os.path.splitext(path)[1].lower() in AUDIO_EXT_SET]
+
+        if not file_paths:
+            if len(dropped) == 1:
+                messagebox.showerror("Error", "The dropped file is not a supported audio file.")
+            else:
+                messagebox.showerror("Error", "None of the dropped files are supported audio files.")
+            self.file_paths = []
             return
 
+        self.file_paths = file_paths
         self.update_file_label()
 
     def choose_file(self):
-        self.file_path = filedialog.askopenfilename(filetypes=[("Audio Files", " ".join(f"*{ext}" for ext in AUDIO_EXTENSIONS))])
-        if self.file_path:
+        self.file_paths = list(filedialog.askopenfilenames(filetypes=AUDIO_FILETYPES))
+        if self.file_paths:
             self.update_file_label()
 
     def choose_output_folder(self):
@@ -160,13 +753,23 @@ class GUI:
         if folder:
             self.output_folder_var.set(folder)
 
+    def describe_files(self):
+        if len(self.file_paths) == 1:
+            return os.path.basename(self.file_paths[0])
+        return f"{len(self.file_paths)} files"
+
     def update_file_label(self):
-        self.label.config(text=f"File ready: {os.path.basename(self.file_path)}")
+        if len(self.file_paths) == 1:
+            self.label.config(text=f"File ready: {self.describe_files()}")
+        else:
+            self.label.config(text=f"{self.describe_files()} ready")
         self.start_button.config(state="normal")
 
     def start_processing(self):
-        if not self.file_path:
+        if not self.file_paths:
             return
+        file_paths = list(self.file_paths)
+        description = self.describe_files()
         chunk_length_minutes = int(self.chunk_length_entry.get())
         normalize = self.normalize_var.get()
         output_folder = self.output_folder_var.get()
@@ -175,37 +778,65 @@ class GUI:
         self.start_button.pack_forget()
         self.cancel_button.pack(side=tk.LEFT)
         self.progress_bar.pack()  # Show progress bar
-        self.master.update()
         
         import threading
         self.cancel_event = threading.Event()
         
+        cancel_event = self.cancel_event
+
         def process_thread():
             try:
-                success = split_audio(self.file_path, chunk_length_minutes, progress_callback=self.update_progress, cancel_event=self.cancel_event, normalize=normalize, output_folder=output_folder)
-                if not self.cancel_event.is_set():
+                success = split_many(file_paths, chunk_length_minutes, progress_callback=self.update_progress, cancel_event=cancel_event, normalize=normalize, output_folder=output_folder)
+                if not cancel_event.is_set():
                     if success:
-                        self.label.config(text=f"Processing complete:\n{os.path.basename(self.file_path)}", foreground="green")
+                        self.ui_queue.put(('label', f"Processing complete:\n{description}", "green"))
             except Exception as e:
-                self.label.config(text="Error occurred during processing", foreground="red")
-                messagebox.showerror("Error", f"An error occurred while processing the audio file: {str(e)}")
+                if not cancel_event.is_set():
+                    self.ui_queue.put(('label', "Error occurred during processing", "red"))
+                    self.ui_queue.put(('messagebox', "Error", f"An error occurred while processing the audio file: {str(e)}"))
             finally:
-                self.cancel_button.pack_forget()
-                self.start_button.pack(side=tk.LEFT, padx=(0, 10))
-                self.progress_bar.pack_forget()  
+                self.ui_queue.put(('reset',))
         
         threading.Thread(target=process_thread).start()
 
     def cancel_processing(self):
         if self.cancel_event:
             self.cancel_event.set()
-            self.label.config(text="Processing cancelled")
-            self.progress_bar["value"] = 0
+            # Queued behind anything the worker already sent, so its late updates can't overwrite
+            # this. The worker queues the reset itself once its FFmpeg processes have stopped
+            self.ui_queue.put(('label', "Processing cancelled", "black"))
             self.progress_bar.pack_forget()
 
+    def reset_controls(self):
+        self.cancel_button.pack_forget()
+        self.start_button.pack(side=tk.LEFT, padx=(0, 10))
+        self.progress_bar["value"] = 0
+        self.progress_bar.pack_forget()
+
     def update_progress(self, value):
-        self.progress_bar["value"] = value
-        self.master.update()
+        self.ui_queue.put(('progress', value))
+
+    def drain_ui_queue(self):
+        # Only the latest of a burst of progress updates is worth drawing
+        progress = None
+        while True:
+            try:
+                message = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            kind = message[0]
+            if kind == 'progress':
+                progress = message[1]
+            elif kind == 'label':
+                self.label.config(text=message[1], foreground=message[2])
+            elif kind == 'messagebox':
+                messagebox.showerror(message[1], message[2])
+            elif kind == 'reset':
+                progress = None
+                self.reset_controls()
+        if progress is not None:
+            self.progress_bar["value"] = progress
+        self.master.after(50, self.drain_ui_queue)
 
 if __name__ == "__main__":
     root = TkinterDnD.Tk()